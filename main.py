@@ -1,156 +1,339 @@
 import os
 import re
 import json
+import mmap
 import threading
 import concurrent.futures
+import itertools
 from pathlib import Path
 import time
+from collections import deque, namedtuple
 import colorama
 from colorama import Fore, Style, Back
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
 colorama.init(autoreset=True)
 
+Match = namedtuple('Match', 'line_num line json_path', defaults=(None,))
+
+MMAP_THRESHOLD = 64 * 1024
+SCAN_CHUNK_SIZE = 1024 * 1024
+MAP_CHUNKSIZE = 16
+MAX_PENDING_PER_WORKER = 4
+PROGRESS_INTERVAL = 0.25
+O_BINARY = getattr(os, 'O_BINARY', 0)
+
+def _read_fd(fd, size):
+    chunks = []
+    chunk = os.read(fd, size + 1)
+    while chunk:
+        chunks.append(chunk)
+        chunk = os.read(fd, SCAN_CHUNK_SIZE)
+    return b''.join(chunks)
+
+def _count_newlines(data, newline, start, end):
+    if isinstance(data, mmap.mmap):
+        return data[start:end].count(newline)
+    return data.count(newline, start, end)
+
+def _iter_hit_lines(data, find, needle, newline=b'\n'):
+    size = len(data)
+    line_num = 1
+    counted = 0
+    pos = find(needle)
+    while -1 < pos < size:
+        start = data.rfind(newline, 0, pos) + 1
+        end = data.find(newline, pos)
+        if end == -1:
+            end = size
+        line_num += _count_newlines(data, newline, counted, start)
+        counted = start
+        yield line_num, start, end
+        pos = find(needle, end + 1)
+
+def _stop_scan(_id, _start, _end, _flags, _context):
+    return True
+
+def _load_json(data):
+    if orjson is not None:
+        try:
+            with memoryview(data) as view:
+                return orjson.loads(view)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(str(data, 'utf-8', errors='ignore'))
+
+def _format_json_path(root, link):
+    parts = []
+    while link is not None:
+        link, key = link
+        parts.append(f"[{key}]" if isinstance(key, int) else f".{key}")
+    return root + ''.join(reversed(parts))
+
+def _folded_finder(data):
+    chunk_start = 0
+    chunk = None
+    
+    def find(needle, start=0):
+        nonlocal chunk_start, chunk
+        chunk_size = max(SCAN_CHUNK_SIZE, 2 * len(needle))
+        step = chunk_size - (len(needle) - 1)
+        size = len(data)
+        while start < size:
+            if chunk is None or not chunk_start <= start < chunk_start + step:
+                chunk_start = start
+                chunk = data[start:start + chunk_size].lower()
+            i = chunk.find(needle, start - chunk_start)
+            if i != -1:
+                return chunk_start + i
+            start = chunk_start + step
+        return -1
+    return find
+
 class FileSearcher:
     def __init__(self, search_term, directory, exclude_patterns=None, max_workers=1000, 
                  file_extensions=None, case_sensitive=False):
         self.search_term = search_term
         self.directory = directory
         self.exclude_patterns = exclude_patterns or []
+        self._exclude_literals = ()
+        self._exclude_automaton = None
+        self._exclude_res = ()
+        self._exclude_dir_res = ()
+        if all(re.escape(pattern) == pattern for pattern in self.exclude_patterns):
+            self._exclude_literals = tuple(self.exclude_patterns)
+            if ahocorasick is not None and self._exclude_literals and all(self._exclude_literals):
+                self._exclude_automaton = ahocorasick.Automaton()
+                for pattern in self._exclude_literals:
+                    self._exclude_automaton.add_word(pattern, pattern)
+                self._exclude_automaton.make_automaton()
+        else:
+            self._exclude_res = tuple(re.compile(pattern) for pattern in self.exclude_patterns)
+            self._exclude_dir_res = tuple(compiled for compiled in self._exclude_res if not any(
+                token in compiled.pattern for token in ('$', '\\Z', '\\b', '\\B', '(?=', '(?!')))
         self.max_workers = max(1, max_workers)
         self.file_extensions = file_extensions or ['.txt', '.json', '.sql', '.py', '.md', '.csv', '.log', '.xml', '.html', '.js', '.css']
+        self._extensions = frozenset(ext.lower() for ext in self.file_extensions)
         self.case_sensitive = case_sensitive
+        self._needle = search_term
+        self._needle_lower = search_term.lower()
+        self._needle_folded = search_term.casefold()
+        self._needle_bytes = search_term.encode() if case_sensitive else search_term.encode().lower()
+        self._highlight_re = re.compile(f'({re.escape(search_term)})', 0 if case_sensitive else re.IGNORECASE)
+        self._highlight_repl = f'{Back.RED}{Fore.WHITE}{Style.BRIGHT}\\1{Style.RESET_ALL}'
+        self._highlighted_term = f'{Back.RED}{Fore.WHITE}{Style.BRIGHT}{search_term}{Style.RESET_ALL}'
+        self._hyperscan_db = None
+        self._executor = None
+        self._workers = 1
         self.results = {}
         self.files_processed = 0
         self.matches_found = 0
-        self.lock = threading.Lock()
         self.start_time = time.time()
     
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_hyperscan_db'] = None
+        state['_executor'] = None
+        return state
+    
     def is_excluded(self, file_path):
-        return any(re.search(pattern, file_path) for pattern in self.exclude_patterns)
+        if self._exclude_automaton is not None:
+            return next(self._exclude_automaton.iter(file_path), None) is not None
+        if self._exclude_res:
+            return any(pattern.search(file_path) for pattern in self._exclude_res)
+        return any(pattern in file_path for pattern in self._exclude_literals)
     
-    def is_binary_file(self, file_path):
-        try:
-            with open(file_path, 'rb') as f:
-                return b'\0' in f.read(1024)
-        except Exception:
-            return True
+    def _is_dir_excluded(self, dir_path):
+        if not self._exclude_res:
+            return self.is_excluded(dir_path)
+        return any(pattern.search(dir_path) for pattern in self._exclude_dir_res)
     
-    def is_searchable_file(self, file_path):
-        if self.is_excluded(file_path) or self.is_binary_file(file_path):
-            return False
-        ext = os.path.splitext(file_path)[1].lower()
-        return not self.file_extensions or ext in self.file_extensions
+    def has_searchable_extension(self, file_path):
+        head, _, ext = file_path.rpartition('.')
+        return bool(head) and f'.{ext.lower()}' in self._extensions
     
     def search_file(self, file_path):
         matches = []
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                for line_num, line in enumerate(f, 1):
-                    if (self.case_sensitive and self.search_term in line) or \
-                       (not self.case_sensitive and self.search_term.lower() in line.lower()):
-                        matches.append({
-                            'line_num': line_num,
-                            'line': line.rstrip(),
-                            'file_path': file_path
-                        })
-            
-            if file_path.lower().endswith('.json'):
-                try:
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        json_data = json.load(f)
-                    matches.extend(self.search_json(json_data, file_path))
-                except json.JSONDecodeError:
-                    pass
+            fd = os.open(file_path, os.O_RDONLY | O_BINARY)
+            try:
+                size = os.fstat(fd).st_size
+                if size > MMAP_THRESHOLD:
+                    with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as data:
+                        matches = self.search_buffer(data, file_path)
+                else:
+                    matches = self.search_buffer(_read_fd(fd, size), file_path)
+            finally:
+                os.close(fd)
         except Exception as e:
             print(f"{Fore.RED}Error processing {file_path}: {str(e)}")
         return matches
     
+    def search_buffer(self, data, file_path):
+        matches = []
+        if not self.case_sensitive and not self._needle.isascii():
+            text = str(data, 'utf-8', errors='ignore')
+            folded = text.casefold()
+            lines = None
+            for line_num, _, _ in _iter_hit_lines(folded, folded.find, self._needle_folded, '\n'):
+                if lines is None:
+                    lines = text.split('\n')
+                matches.append(Match(line_num, lines[line_num - 1].rstrip()))
+        else:
+            if hyperscan is not None and self._needle_bytes and not self._hyperscan_has_hit(data):
+                return matches
+            if self.case_sensitive or not self._needle_bytes:
+                find = data.find
+            elif isinstance(data, mmap.mmap):
+                find = _folded_finder(data)
+            else:
+                find = data.lower().find
+            for line_num, start, end in _iter_hit_lines(data, find, self._needle_bytes):
+                matches.append(Match(line_num, data[start:end].decode('utf-8', errors='ignore').rstrip()))
+        
+        if matches and file_path.lower().endswith('.json'):
+            try:
+                json_data = _load_json(data)
+                matches.extend(self.search_json(json_data, file_path))
+            except json.JSONDecodeError:
+                pass
+        return matches
+    
+    def _hyperscan_has_hit(self, data):
+        if self._hyperscan_db is None:
+            self._hyperscan_db = hyperscan.Database()
+            self._hyperscan_db.compile(expressions=[self._needle_bytes], ids=[0], elements=1,
+                                       flags=0 if self.case_sensitive else hyperscan.HS_FLAG_CASELESS,
+                                       literal=True)
+        try:
+            self._hyperscan_db.scan(data, match_event_handler=_stop_scan)
+        except hyperscan.ScanTerminated:
+            return True
+        return False
+    
     def search_json(self, data, file_path, path="$"):
         matches = []
-        if isinstance(data, dict):
-            for k, v in data.items():
-                current_path = f"{path}.{k}"
-                if (self.case_sensitive and self.search_term in str(k)) or \
-                   (not self.case_sensitive and self.search_term.lower() in str(k).lower()):
-                    matches.append({
-                        'line_num': 0,
-                        'line': f"{current_path}: {str(k)}",
-                        'file_path': file_path,
-                        'json_path': current_path
-                    })
-                if isinstance(v, (dict, list)):
-                    matches.extend(self.search_json(v, file_path, current_path))
-                elif isinstance(v, str) and ((self.case_sensitive and self.search_term in v) or 
-                                            (not self.case_sensitive and self.search_term.lower() in v.lower())):
-                    matches.append({
-                        'line_num': 0,
-                        'line': f"{current_path}: {v}",
-                        'file_path': file_path,
-                        'json_path': current_path
-                    })
-                elif self.search_term in str(v):
-                    matches.append({
-                        'line_num': 0,
-                        'line': f"{current_path}: {str(v)}",
-                        'file_path': file_path,
-                        'json_path': current_path
-                    })
-        elif isinstance(data, list):
-            for i, item in enumerate(data):
-                current_path = f"{path}[{i}]"
-                if isinstance(item, (dict, list)):
-                    matches.extend(self.search_json(item, file_path, current_path))
-                elif isinstance(item, str) and ((self.case_sensitive and self.search_term in item) or 
-                                              (not self.case_sensitive and self.search_term.lower() in item.lower())):
-                    matches.append({
-                        'line_num': 0,
-                        'line': f"{current_path}: {item}",
-                        'file_path': file_path,
-                        'json_path': current_path
-                    })
-                elif self.search_term in str(item):
-                    matches.append({
-                        'line_num': 0,
-                        'line': f"{current_path}: {str(item)}",
-                        'file_path': file_path,
-                        'json_path': current_path
-                    })
+        if self.case_sensitive:
+            needle, fold = self._needle, None
+        elif self._needle.isascii():
+            needle, fold = self._needle_lower, str.lower
+        else:
+            needle, fold = self._needle_folded, str.casefold
+        stack = deque()
+        
+        def push_children(node, parent):
+            if isinstance(node, dict):
+                stack.extend((k, v, parent) for k, v in reversed(node.items()))
+            else:
+                stack.extend((i, node[i], parent) for i in range(len(node) - 1, -1, -1))
+        
+        if isinstance(data, (dict, list)):
+            push_children(data, None)
+        while stack:
+            key, value, parent = stack.pop()
+            link = (parent, key)
+            if isinstance(key, str) and needle in (key if fold is None else fold(key)):
+                current_path = _format_json_path(path, link)
+                matches.append(Match(0, f"{current_path}: {key}", current_path))
+            if isinstance(value, (dict, list)):
+                push_children(value, link)
+                continue
+            text = value if isinstance(value, str) else str(value)
+            if needle in (text if fold is None else fold(text)):
+                current_path = _format_json_path(path, link)
+                matches.append(Match(0, f"{current_path}: {text}", current_path))
         return matches
     
     def process_file(self, file_path):
-        if not self.is_searchable_file(file_path):
-            return
-        matches = self.search_file(file_path)
-        if matches:
-            with self.lock:
-                self.results[file_path] = matches
-                self.matches_found += len(matches)
-        with self.lock:
-            self.files_processed += 1
+        return file_path, self.search_file(file_path)
+    
+    def _iter_files(self, root):
+        stack = [root]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not self._is_dir_excluded(entry.path):
+                                stack.append(entry.path)
+                        elif entry.is_file() and self.has_searchable_extension(entry.name) \
+                                and not self.is_excluded(entry.path):
+                            yield entry.path
+            except OSError:
+                continue
+            
+    def _print_progress(self):
+        elapsed = time.time() - self.start_time
+        files_per_sec = self.files_processed / elapsed if elapsed > 0 else 0
+        print(f"{Fore.RED}{Style.BRIGHT}Progress: {self.files_processed} files - {files_per_sec:.1f} files/sec{Style.RESET_ALL}", end='\r')
+    
+    def _report_progress(self, done):
+        while not done.wait(PROGRESS_INTERVAL):
+            self._print_progress()
+            
+    def _get_executor(self):
+        if self._executor is None:
+            self._workers = max(1, min(self.max_workers, os.cpu_count() or 1))
+            self._executor = concurrent.futures.ProcessPoolExecutor(max_workers=self._workers,
+                                                                    initializer=_init_worker, initargs=(self,))
+        return self._executor
+    
+    def _map_files(self, executor, paths):
+        max_pending = self._workers * MAX_PENDING_PER_WORKER
+        pending = deque()
+        while True:
+            batch = list(itertools.islice(paths, MAP_CHUNKSIZE))
+            if batch:
+                pending.append(executor.submit(process_files, batch))
+            if pending and (not batch or len(pending) >= max_pending):
+                yield from pending.popleft().result()
+            elif not batch:
+                return
+    
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
             
     def search_directory(self):
-        all_files = []
-        for root, _, files in os.walk(self.directory):
-            for file in files:
-                all_files.append(os.path.join(root, file))
+        self.results = {}
+        self.files_processed = 0
+        self.matches_found = 0
+        self.start_time = time.time()
+        executor = self._get_executor()
+        done = threading.Event()
+        reporter = threading.Thread(target=self._report_progress, args=(done,), daemon=True)
+        reporter.start()
+        try:
+            results = self._map_files(executor, self._iter_files(self.directory))
+            for file_path, matches in results:
+                self.files_processed += 1
+                if matches:
+                    self.results[file_path] = matches
+                    self.matches_found += len(matches)
+        finally:
+            done.set()
+            reporter.join()
         
-        total_files = len(all_files)
-        if total_files == 0:
+        if self.files_processed == 0:
             print(f"{Back.RED}{Fore.WHITE}{Style.BRIGHT} No files found to search in {self.directory} {Style.RESET_ALL}")
             return self.results
-            
-        print(f"{Back.RED}{Fore.WHITE}{Style.BRIGHT} Found {total_files} files to search {Style.RESET_ALL}")
-        effective_workers = max(1, min(self.max_workers, total_files))
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=effective_workers) as executor:
-            futures = [executor.submit(self.process_file, file_path) for file_path in all_files]
-            for i, future in enumerate(concurrent.futures.as_completed(futures)):
-                if i % 100 == 0 or i == total_files - 1:
-                    progress = (i + 1) / total_files * 100
-                    elapsed = time.time() - self.start_time
-                    files_per_sec = (i + 1) / elapsed if elapsed > 0 else 0
-                    print(f"{Fore.RED}{Style.BRIGHT}Progress: {progress:.1f}% ({i+1}/{total_files}) - {files_per_sec:.1f} files/sec{Style.RESET_ALL}", end='\r')
         
+        self._print_progress()
         print(f"\n{Back.RED}{Fore.WHITE}{Style.BRIGHT} Search completed. Processed {self.files_processed} files and found {self.matches_found} matches. {Style.RESET_ALL}")
         return self.results
     
@@ -167,25 +350,31 @@ class FileSearcher:
             print(f"\n{Back.RED}{Fore.WHITE}{Style.BRIGHT} File: {rel_path} ({len(matches)} matches) {Style.RESET_ALL}")
             
             for match in matches:
-                if 'json_path' in match:
-                    print(f"{Fore.RED}{Style.BRIGHT}JSON Path: {match['json_path']}{Style.RESET_ALL}")
-                    highlighted_line = self.highlight_match(match['line'])
+                if match.json_path is not None:
+                    print(f"{Fore.RED}{Style.BRIGHT}JSON Path: {match.json_path}{Style.RESET_ALL}")
+                    highlighted_line = self.highlight_match(match.line)
                     print(f"  {highlighted_line}")
                 else:
-                    line_num = match['line_num']
-                    print(f"{Fore.RED}{Style.BRIGHT}Line {line_num}:{Style.RESET_ALL}")
-                    highlighted_line = self.highlight_match(match['line'])
+                    print(f"{Fore.RED}{Style.BRIGHT}Line {match.line_num}:{Style.RESET_ALL}")
+                    highlighted_line = self.highlight_match(match.line)
                     print(f"  {highlighted_line}")
                     
         print(f"\n{Back.RED}{Fore.WHITE}{Style.BRIGHT} Total: {self.matches_found} matches in {len(self.results)} files {Style.RESET_ALL}")
         print(f"{Fore.RED}{Style.BRIGHT}Time taken: {time.time() - self.start_time:.2f} seconds{Style.RESET_ALL}")
     
     def highlight_match(self, line):
-        pattern = re.escape(self.search_term)
         if self.case_sensitive:
-            return re.sub(f'({pattern})', f'{Back.RED}{Fore.WHITE}{Style.BRIGHT}\\1{Style.RESET_ALL}', line)
-        else:
-            return re.sub(f'({pattern})', f'{Back.RED}{Fore.WHITE}{Style.BRIGHT}\\1{Style.RESET_ALL}', line, flags=re.IGNORECASE)
+            return line.replace(self._needle, self._highlighted_term)
+        return self._highlight_re.sub(self._highlight_repl, line)
+
+_worker_searcher = None
+
+def _init_worker(searcher):
+    global _worker_searcher
+    _worker_searcher = searcher
+
+def process_files(file_paths):
+    return [_worker_searcher.process_file(file_path) for file_path in file_paths]
 
 def interactive_cli():
     print(f"{Back.RED}{Fore.WHITE}{Style.BRIGHT}                        DB SEARCHER - The FASTEST SEARCHER in the world                         {Style.RESET_ALL}")
@@ -203,9 +392,10 @@ def interactive_cli():
     extensions_input = input(f"{Back.RED}{Fore.WHITE} Enter file extensions to search (comma separated, leave empty for all common text files): {Style.RESET_ALL} ")
     file_extensions = [f".{ext.strip().lstrip('.')}" for ext in extensions_input.split(',')] if extensions_input.strip() else None
     
-    threads_input = input(f"{Back.RED}{Fore.WHITE} Enter maximum number of threads [1000]: {Style.RESET_ALL} ")
-    max_workers = int(threads_input) if threads_input.strip() and threads_input.strip().isdigit() else 1000
-    max_workers = max(1, max_workers)
+    cpu_count = os.cpu_count() or 1
+    workers_input = input(f"{Back.RED}{Fore.WHITE} Enter number of worker processes (at most {cpu_count}) [{cpu_count}]: {Style.RESET_ALL} ")
+    max_workers = int(workers_input) if workers_input.strip() and workers_input.strip().isdigit() else cpu_count
+    max_workers = max(1, min(max_workers, cpu_count))
     
     case_sensitive_input = input(f"{Back.RED}{Fore.WHITE} Case sensitive search? (y/n) [n]: {Style.RESET_ALL} ")
     case_sensitive = case_sensitive_input.lower().startswith('y')
@@ -216,7 +406,7 @@ def interactive_cli():
     print(f"{Fore.RED}Directory: {Fore.WHITE}{directory}")
     print(f"{Fore.RED}Exclude patterns: {Fore.WHITE}{exclude_patterns}")
     print(f"{Fore.RED}File extensions: {Fore.WHITE}{file_extensions or 'All common text files'}")
-    print(f"{Fore.RED}Max threads: {Fore.WHITE}{max_workers}")
+    print(f"{Fore.RED}Worker processes: {Fore.WHITE}{max_workers}")
     print(f"{Fore.RED}Case sensitive: {Fore.WHITE}{case_sensitive}")
     print(f"{Fore.RED}{Style.BRIGHT}{'=' * 80}{Style.RESET_ALL}\n")
     
@@ -229,7 +419,10 @@ def interactive_cli():
         case_sensitive=case_sensitive
     )
     
-    searcher.search_directory()
+    try:
+        searcher.search_directory()
+    finally:
+        searcher.close()
     searcher.print_results()
 
 if __name__ == "__main__":